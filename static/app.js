@@ -0,0 +1,582 @@
+const API = window.location.origin;
+
+// Element handles looked up once; the script runs after the markup is parsed
+const $ = Object.fromEntries([
+  "from_date", "to_date", "reg_search", "limit", "tbody", "tableScroll", "tableInfo",
+  "kpi_total_ros", "kpi_ro_amt", "kpi_parts_amt", "kpi_labor_amt",
+  "themeBtn", "clearBtn", "exportBtn", "exportProgress",
+].map(id => [id, document.getElementById(id)]));
+const _allWidgets = [];
+
+/* ── Branch MultiSelect: stores codes internally, displays names ── */
+function BranchMultiSelect(wrapperId, placeholder) {
+  const wrap    = document.getElementById(wrapperId);
+  const trigger = document.createElement("button");
+  trigger.type  = "button";
+  trigger.className = "ms-trigger";
+  trigger.textContent = placeholder;
+
+  const panel   = document.createElement("div");
+  panel.className = "ms-panel";
+  panel.innerHTML = `
+    <input class="ms-search" type="text" placeholder="Search…"/>
+    <div class="ms-actions">
+      <button type="button" data-a="all">Select All</button>
+      <button type="button" data-a="none">Clear</button>
+    </div>
+    <div class="ms-list"></div>`;
+
+  document.body.appendChild(panel);
+  wrap.appendChild(trigger);
+
+  const search = panel.querySelector(".ms-search");
+  const list   = panel.querySelector(".ms-list");
+  let options  = [];   // [{code, name}]
+  let selected = new Set();  // stores codes
+  let onChange = null;
+
+  function reposition() {
+    const r = trigger.getBoundingClientRect();
+    const vh = window.innerHeight;
+    if (vh - r.bottom >= 280 || vh - r.bottom >= 120) {
+      panel.style.top    = (r.bottom + 4) + "px";
+      panel.style.bottom = "auto";
+    } else {
+      panel.style.bottom = (vh - r.top + 4) + "px";
+      panel.style.top    = "auto";
+    }
+    panel.style.left  = r.left + "px";
+    panel.style.width = Math.max(r.width, 220) + "px";
+  }
+
+  function updateTrigger() {
+    if (selected.size === 0)      trigger.textContent = placeholder;
+    else if (selected.size === 1) {
+      const code = [...selected][0];
+      const opt  = options.find(o => o.code === code);
+      trigger.textContent = opt ? opt.name : code;
+    }
+    else trigger.textContent = selected.size + " selected";
+    trigger.classList.toggle("active", selected.size > 0);
+  }
+
+  let shown = [];   // options currently listed, indexed by the rows' data-i
+
+  function render() {
+    const q = search.value.trim().toLowerCase();
+    shown = options.filter(opt => !q || opt.name.toLowerCase().includes(q) || opt.code.toLowerCase().includes(q));
+    list.innerHTML = msListHtml(placeholder, selected.size === 0,
+                                shown.map(opt => [opt.name, selected.has(opt.code)]));
+    updateTrigger();
+  }
+
+  function fire() { if (onChange) onChange([...selected]); }
+  function open() {
+    closeAll(); reposition();
+    panel.classList.add("open"); trigger.classList.add("active");
+    search.value = ""; render(); search.focus();
+  }
+  function close() {
+    panel.classList.remove("open");
+    if (selected.size === 0) trigger.classList.remove("active");
+  }
+
+  _allWidgets.push({ close });
+  trigger.addEventListener("click", e => { e.stopPropagation(); panel.classList.contains("open") ? close() : open(); });
+  search.addEventListener("input", render);
+  list.addEventListener("mousedown", e => {
+    const row = e.target.closest(".ms-item");
+    if (!row) return;
+    e.preventDefault();
+    const i = Number(row.dataset.i);
+    if (i < 0) selected.clear();
+    else { const c = shown[i].code; selected.has(c) ? selected.delete(c) : selected.add(c); }
+    render(); fire();
+  });
+  search.addEventListener("click", e => e.stopPropagation());
+  panel.addEventListener("click",  e => e.stopPropagation());
+  panel.querySelectorAll(".ms-actions button").forEach(btn => {
+    btn.addEventListener("mousedown", e => {
+      e.preventDefault();
+      if (btn.dataset.a === "all") selected = new Set(options.map(o => o.code));
+      else selected.clear();
+      render(); fire();
+    });
+  });
+  window.addEventListener("scroll", () => { if (panel.classList.contains("open")) reposition(); }, true);
+  window.addEventListener("resize", () => { if (panel.classList.contains("open")) reposition(); });
+
+  this.setOptions = arr => {
+    // arr: [{code, name}, ...] — skip the {code:"All"} sentinel
+    options  = (arr || []).filter(o => o.code !== "All");
+    selected = new Set([...selected].filter(c => options.some(o => o.code === c)));
+    render();
+  };
+  this.getValues = () => [...selected];   // returns codes
+  this.clear     = () => { selected.clear(); render(); };
+  this.onChange  = fn => { onChange = fn; };
+}
+
+/* ── Standard string MultiSelect ── */
+function MultiSelect(wrapperId, placeholder) {
+  const wrap    = document.getElementById(wrapperId);
+  const trigger = document.createElement("button");
+  trigger.type  = "button";
+  trigger.className = "ms-trigger";
+  trigger.textContent = placeholder;
+
+  const panel   = document.createElement("div");
+  panel.className = "ms-panel";
+  panel.innerHTML = `
+    <input class="ms-search" type="text" placeholder="Search…"/>
+    <div class="ms-actions">
+      <button type="button" data-a="all">Select All</button>
+      <button type="button" data-a="none">Clear</button>
+    </div>
+    <div class="ms-list"></div>`;
+
+  document.body.appendChild(panel);
+  wrap.appendChild(trigger);
+
+  const search = panel.querySelector(".ms-search");
+  const list   = panel.querySelector(".ms-list");
+  let options  = [];
+  let selected = new Set();
+  let onChange = null;
+
+  function reposition() {
+    const r = trigger.getBoundingClientRect();
+    const vh = window.innerHeight;
+    if (vh - r.bottom >= 280 || vh - r.bottom >= 120) {
+      panel.style.top    = (r.bottom + 4) + "px";
+      panel.style.bottom = "auto";
+    } else {
+      panel.style.bottom = (vh - r.top + 4) + "px";
+      panel.style.top    = "auto";
+    }
+    panel.style.left  = r.left + "px";
+    panel.style.width = Math.max(r.width, 200) + "px";
+  }
+
+  function updateTrigger() {
+    if (selected.size === 0)       trigger.textContent = placeholder;
+    else if (selected.size === 1)  trigger.textContent = [...selected][0];
+    else                           trigger.textContent = selected.size + " selected";
+    trigger.classList.toggle("active", selected.size > 0);
+  }
+
+  let shown = [];   // options currently listed, indexed by the rows' data-i
+
+  function render() {
+    const q = search.value.trim().toLowerCase();
+    shown = options.filter(opt => opt !== "All" && (!q || opt.toLowerCase().includes(q)));
+    list.innerHTML = msListHtml(placeholder, selected.size === 0,
+                                shown.map(opt => [opt, selected.has(opt)]));
+    updateTrigger();
+  }
+
+  function fire() { if (onChange) onChange([...selected]); }
+  function open() {
+    closeAll(); reposition();
+    panel.classList.add("open"); trigger.classList.add("active");
+    search.value = ""; render(); search.focus();
+  }
+  function close() {
+    panel.classList.remove("open");
+    if (selected.size === 0) trigger.classList.remove("active");
+  }
+
+  _allWidgets.push({ close });
+  trigger.addEventListener("click", e => { e.stopPropagation(); panel.classList.contains("open") ? close() : open(); });
+  search.addEventListener("input", render);
+  list.addEventListener("mousedown", e => {
+    const row = e.target.closest(".ms-item");
+    if (!row) return;
+    e.preventDefault();
+    const i = Number(row.dataset.i);
+    if (i < 0) selected.clear();
+    else { const v = shown[i]; selected.has(v) ? selected.delete(v) : selected.add(v); }
+    render(); fire();
+  });
+  search.addEventListener("click", e => e.stopPropagation());
+  panel.addEventListener("click",  e => e.stopPropagation());
+  panel.querySelectorAll(".ms-actions button").forEach(btn => {
+    btn.addEventListener("mousedown", e => {
+      e.preventDefault();
+      if (btn.dataset.a === "all") selected = new Set(options.filter(o => o !== "All"));
+      else selected.clear();
+      render(); fire();
+    });
+  });
+  window.addEventListener("scroll", () => { if (panel.classList.contains("open")) reposition(); }, true);
+  window.addEventListener("resize", () => { if (panel.classList.contains("open")) reposition(); });
+
+  this.setOptions = arr => {
+    options  = arr || [];
+    selected = new Set([...selected].filter(v => options.includes(v)));
+    render();
+  };
+  this.getValues = () => [...selected];
+  this.clear     = () => { selected.clear(); render(); };
+  this.onChange  = fn => { onChange = fn; };
+}
+
+function escapeHtml(v) {
+  return String(v).replace(/&/g, "&amp;").replace(/</g, "&lt;").replace(/>/g, "&gt;")
+                  .replace(/"/g, "&quot;").replace(/'/g, "&#39;");
+}
+
+/* Whole option list as one HTML string, parsed in a single innerHTML pass.
+   items: [[label, checked], ...]; clicks are resolved through data-i by the
+   widget's delegated mousedown listener (-1 = the "All" row). */
+function msListHtml(placeholder, allChecked, items) {
+  const row = (i, cls, label, checked) =>
+    `<div class="${cls}" data-i="${i}"><input type="checkbox" ${checked ? "checked" : ""}/><span class="ms-txt">${escapeHtml(label)}</span></div>`;
+  return row(-1, "ms-item all-row", placeholder, allChecked) +
+         items.map(([label, checked], i) => row(i, "ms-item", label, checked)).join("");
+}
+
+function closeAll() { _allWidgets.forEach(w => w.close()); }
+document.addEventListener("click", closeAll);
+
+// toLocaleString builds a fresh Intl.NumberFormat on every call; make each formatter once
+const INR_FMT = new Intl.NumberFormat("en-IN", {minimumFractionDigits:2, maximumFractionDigits:2});
+const KM_FMT  = new Intl.NumberFormat("en-IN");
+function inr(x) {
+  const n = Number(x||0);
+  if (isNaN(n)) return "₹0.00";
+  return "₹" + INR_FMT.format(n);
+}
+// keyword -> class, checked in order (green keywords win over amber ones)
+const BADGE_TABLE = new Map([
+  ["approved", "badge badge-green"],
+  ["ready",    "badge badge-green"],
+  ["hold",     "badge badge-amber"],
+  ["await",    "badge badge-amber"],
+  ["progress", "badge badge-amber"],
+]);
+const BADGE_DEFAULT = "badge badge-green";
+const _badgeMemo = new Map();   // raw status -> class; the sheet only has a handful of statuses
+function badgeClass(s) {
+  s = s||"";
+  let cls = _badgeMemo.get(s);
+  if (cls === undefined) {
+    const t = s.toLowerCase();
+    cls = BADGE_DEFAULT;
+    for (const [k, v] of BADGE_TABLE) if (t.includes(k)) { cls = v; break; }
+    _badgeMemo.set(s, cls);
+  }
+  return cls;
+}
+
+function addCell(tr, text, cls) {
+  // textContent, not innerHTML: sheet values are shown verbatim, never parsed as markup
+  const td = document.createElement("td");
+  if (cls) td.className = cls;
+  td.textContent = text;
+  tr.appendChild(td);
+  return td;
+}
+
+/* ── Widgets ── */
+const MS = {
+  branch:      new BranchMultiSelect("ms_branch",      "All Branches"),
+  sa_name:     new MultiSelect("ms_sa_name",     "All SA Names"),
+  status:      new MultiSelect("ms_status",      "All Statuses"),
+  ro_type:     new MultiSelect("ms_ro_type",     "All RO Types"),
+  visit_type:  new MultiSelect("ms_visit_type",  "All Visit Types"),
+  age_bucket:  new MultiSelect("ms_age_bucket",  "All Age Buckets"),
+  hold_reason: new MultiSelect("ms_hold_reason", "All Hold Reasons"),
+  model_name:  new MultiSelect("ms_model_name",  "All Models"),
+};
+
+function getParams() {
+  const p = new URLSearchParams();
+  // Branch: getValues() returns dealer codes — send as-is so backend filter works correctly
+  const branchCodes = MS.branch.getValues();
+  if (branchCodes.length) p.append("branch", branchCodes.join(","));
+
+  const add = (key, w) => { const v = w.getValues(); if (v.length) p.append(key, v.join(",")); };
+  add("sa_name",     MS.sa_name);
+  add("status",      MS.status);
+  add("ro_type",     MS.ro_type);
+  add("visit_type",  MS.visit_type);
+  add("age_bucket",  MS.age_bucket);
+  add("hold_reason", MS.hold_reason);
+  add("model_name",  MS.model_name);
+  const fd = $.from_date.value;
+  const td = $.to_date.value;
+  const rs = $.reg_search.value.trim();
+  if (fd) p.append("from_date", fd);
+  if (td) p.append("to_date",   td);
+  if (rs) p.append("reg_search", rs);
+  return p;
+}
+
+async function reloadSaNames() {
+  const branchCodes = MS.branch.getValues();
+  const p = new URLSearchParams();
+  if (branchCodes.length) p.append("branch", branchCodes.join(","));
+  const res  = await fetch(`${API}/api/sa-names-by-branch?${p}`);
+  const data = await res.json();
+  MS.sa_name.setOptions(data.sa_names || ["All"]);
+}
+
+async function loadFilterOptions() {
+  const res  = await fetch(`${API}/api/filter-options`);
+  const data = await res.json();
+
+  // Branches come as [{code, name}, ...] objects
+  MS.branch.setOptions(data.branches || []);
+
+  MS.sa_name.setOptions(data.sa_names      || ["All"]);
+  MS.status.setOptions(data.statuses       || ["All"]);
+  MS.ro_type.setOptions(data.ro_types      || ["All"]);
+  MS.visit_type.setOptions(data.visit_types || ["All"]);
+  MS.age_bucket.setOptions(data.age_buckets  || ["All"]);
+  MS.hold_reason.setOptions(data.hold_reasons || ["All"]);
+  MS.model_name.setOptions(data.model_names  || ["All"]);
+}
+
+/* ── Response cache: identical filter combinations within the TTL reuse the
+   earlier payload (or the in-flight request) instead of refetching. ── */
+const CACHE_TTL_MS  = 15000;
+const _respCache    = new Map();   // url -> {ts, p: Promise<json>}
+function cachedFetch(url, ttl = CACHE_TTL_MS) {
+  const now = Date.now();
+  const hit = _respCache.get(url);
+  if (hit && now - hit.ts < ttl) return hit.p;
+  if (_respCache.size > 200) {
+    _respCache.forEach((v, k) => { if (now - v.ts >= ttl) _respCache.delete(k); });
+  }
+  const p = fetch(url).then(r => r.json());
+  _respCache.set(url, { ts: now, p });
+  p.catch(() => _respCache.delete(url));
+  return p;
+}
+
+async function loadStats() {
+  paintStats(await cachedFetch(`${API}/api/stats?${getParams()}`));
+}
+
+function paintStats(s) {
+  $.kpi_total_ros.textContent = s.total_ros || 0;
+  $.kpi_ro_amt.textContent    = inr(s.total_ro_amount    || 0);
+  $.kpi_parts_amt.textContent = inr(s.total_parts_amount || 0);
+  $.kpi_labor_amt.textContent = inr(s.total_labor_amount || 0);
+}
+
+function pageParams() {
+  const p = getParams();
+  p.append("skip","0"); p.append("limit", $.limit.value);
+  return p;
+}
+
+async function loadRows() {
+  paintRows(await cachedFetch(`${API}/api/rows?${pageParams()}`));
+}
+
+function paintRows(data) {
+  const rows = data.rows || [];
+  $.tableInfo.textContent =
+    `Showing ${rows.length} of ${data.filtered_count} vehicles (Total: ${data.total_count})`;
+  const tb = $.tbody;
+  if (!rows.length) {
+    vRows = [];
+    const tr = document.createElement("tr");
+    addCell(tr, "No data found", "muted").colSpan = 16;
+    tb.replaceChildren(tr);
+    return;
+  }
+  vRows = rows; vStart = -1;
+  $.tableScroll.scrollTop = 0;
+  if (rows.length <= VIRTUAL_MIN_ROWS) {
+    // Build every row off-document and swap them in once: appending to
+    // tb.innerHTML per row re-parses the whole table on each iteration.
+    const frag = document.createDocumentFragment();
+    rows.forEach(r => frag.appendChild(buildRow(r)));
+    tb.replaceChildren(frag);
+  } else {
+    renderWindow();
+  }
+}
+
+function buildRow(r) {
+  const tr = document.createElement("tr");
+  tr.dataset.roId = r.ro_id||"-";
+  addCell(tr, r.ro_id||"-", "ro-id");
+  addCell(tr, r.ro_date||"-");
+  // Display branch_name (city name) in the table; branch (code) used only for filtering
+  addCell(tr, r.branch_name||r.branch||"-");
+  const badge = document.createElement("span");
+  badge.className   = badgeClass(r.status);
+  badge.textContent = r.status||"-";
+  addCell(tr, "").appendChild(badge);
+  addCell(tr, r.ro_type||"-");
+  addCell(tr, r.visit_type||"-");
+  addCell(tr, r.sa_name||"-");
+  addCell(tr, r.reg_number||"-", "reg");
+  addCell(tr, r.customer_name||"-");
+  addCell(tr, r.model_name||"-");
+  addCell(tr, KM_FMT.format(r.km||0));
+  addCell(tr, r.age_bucket||"-");
+  addCell(tr, r.days||0);
+  addCell(tr, inr(r.total_ro_amount||0),    "money");
+  addCell(tr, inr(r.total_parts_amount||0), "money");
+  addCell(tr, inr(r.total_labor_amount||0), "money");
+  return tr;
+}
+
+/* ── Virtual scrolling for the large page sizes ──
+   Above VIRTUAL_MIN_ROWS only the rows in view (plus overscan) are in the DOM;
+   two spacer rows stand in for the rest so the scrollbar keeps its full range. */
+const VIRTUAL_MIN_ROWS = 100;
+const VIRTUAL_OVERSCAN = 10;
+let rowHeight = 38;      // estimate until the first windowed render measures a real row
+let rowMeasured = false;
+let vRows  = [];
+let vStart = -1;
+let vFrame = 0;
+
+function spacerRow(px) {
+  const tr = document.createElement("tr");
+  tr.className = "v-spacer";
+  const td = addCell(tr, "");
+  td.colSpan = 16;
+  td.style.height = `${px}px`;
+  return tr;
+}
+
+function renderWindow() {
+  vFrame = 0;
+  if (vRows.length <= VIRTUAL_MIN_ROWS) return;
+  const sc    = $.tableScroll;
+  const count = Math.ceil((sc.clientHeight || 560) / rowHeight) + 2 * VIRTUAL_OVERSCAN;
+  const start = Math.max(0, Math.floor(sc.scrollTop / rowHeight) - VIRTUAL_OVERSCAN);
+  const end   = Math.min(vRows.length, start + count);
+  if (start === vStart) return;
+  vStart = start;
+  const frag = document.createDocumentFragment();
+  frag.appendChild(spacerRow(start * rowHeight));
+  for (let i = start; i < end; i++) frag.appendChild(buildRow(vRows[i]));
+  frag.appendChild(spacerRow((vRows.length - end) * rowHeight));
+  $.tbody.replaceChildren(frag);
+  const first = $.tbody.children[1];
+  if (!rowMeasured && first && first.offsetHeight) {
+    rowMeasured = true;
+    if (first.offsetHeight !== rowHeight) {
+      rowHeight = first.offsetHeight;   // re-layout once with the measured height
+      vStart = -1;
+      renderWindow();
+    }
+  }
+}
+
+function onTableScroll() {
+  if (!vFrame) vFrame = requestAnimationFrame(renderWindow);
+}
+
+/* Row interactions go through one delegated listener on #tbody (wired in
+   main) rather than one listener per rendered row. */
+function handleRowClick(roId) {
+  // No row action yet; row features hook in here, never as per-row listeners.
+}
+
+// Full refresh: stats and the row page come back together from one server-side filter pass
+async function refreshAll() {
+  const d = await cachedFetch(`${API}/api/dashboard?${pageParams()}`);
+  paintStats(d.stats);
+  paintRows(d);
+}
+
+// Filter widgets fire on every click/keystroke; coalesce bursts. The KPIs
+// follow quickly, the heavier row payload only once the user stops changing filters.
+const STATS_DEBOUNCE_MS = 150;
+const ROWS_DEBOUNCE_MS  = 600;
+let statsTimer = 0, rowsTimer = 0;
+function debouncedRefresh() {
+  clearTimeout(statsTimer); statsTimer = setTimeout(loadStats, STATS_DEBOUNCE_MS);
+  clearTimeout(rowsTimer);  rowsTimer  = setTimeout(loadRows,  ROWS_DEBOUNCE_MS);
+}
+
+function clearAll() {
+  Object.values(MS).forEach(w => w.clear());
+  $.from_date.value  = "";
+  $.to_date.value    = "";
+  $.reg_search.value = "";
+  $.limit.value      = "50";
+  reloadSaNames().then(refreshAll);
+}
+
+/* Download the workbook through fetch + Blob instead of navigating away,
+   so filters, loaded rows and the response cache survive the export. */
+async function exportExcel() {
+  $.exportBtn.disabled = true;
+  $.exportProgress.hidden = false;
+  try {
+    const res = await fetch(`${API}/api/export?${getParams()}`);
+    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+    // "No data" / "No data for filters" come back as a 200 JSON body, not a workbook
+    if ((res.headers.get("Content-Type") || "").includes("application/json")) {
+      const body = await res.json();
+      throw new Error(body.error || "no workbook returned");
+    }
+    const cd   = res.headers.get("Content-Disposition") || "";
+    const m    = /filename\*?=(?:UTF-8'')?"?([^";]+)"?/i.exec(cd);
+    const a    = document.createElement("a");
+    a.href     = URL.createObjectURL(await res.blob());
+    a.download = m ? decodeURIComponent(m[1]) : "open_ro_export.xlsx";
+    document.body.appendChild(a);
+    a.click();
+    a.remove();
+    setTimeout(() => URL.revokeObjectURL(a.href), 0);
+  } catch (err) {
+    alert(`Export failed: ${err.message}`);
+  } finally {
+    $.exportBtn.disabled = false;
+    $.exportProgress.hidden = true;
+  }
+}
+
+function toggleTheme() {
+  document.body.classList.toggle("dark");
+  const dark = document.body.classList.contains("dark");
+  localStorage.setItem("uv_openro_theme", dark?"dark":"light");
+  $.themeBtn.textContent = dark?"☀️":"🌙";
+}
+function initTheme() {
+  if (localStorage.getItem("uv_openro_theme")==="dark") {
+    document.body.classList.add("dark");
+    $.themeBtn.textContent = "☀️";
+  }
+}
+
+(async function main() {
+  initTheme();
+  // The filter options and the first dashboard page (no filters selected yet)
+  // don't depend on each other: request both before wiring anything up.
+  const firstLoad = Promise.all([loadFilterOptions(), refreshAll()]);
+
+  MS.branch.onChange(async () => { await reloadSaNames(); debouncedRefresh(); });
+  MS.sa_name.onChange(debouncedRefresh);
+  MS.status.onChange(debouncedRefresh);
+  MS.ro_type.onChange(debouncedRefresh);
+  MS.visit_type.onChange(debouncedRefresh);
+  MS.age_bucket.onChange(debouncedRefresh);
+  MS.hold_reason.onChange(debouncedRefresh);
+  MS.model_name.onChange(debouncedRefresh);
+
+  $.from_date.addEventListener("change", debouncedRefresh);
+  $.to_date.addEventListener("change",   debouncedRefresh);
+  $.limit.addEventListener("change",     loadRows);   // page size only affects the rows
+  $.reg_search.addEventListener("keyup", debouncedRefresh);
+  $.tableScroll.addEventListener("scroll", onTableScroll, { passive: true });
+  $.tbody.addEventListener("click", e => {
+    const tr = e.target.closest("tr[data-ro-id]");
+    if (tr) handleRowClick(tr.dataset.roId);
+  });
+  $.clearBtn.addEventListener("click",  clearAll);
+  $.themeBtn.addEventListener("click",  toggleTheme);
+  $.exportBtn.addEventListener("click", exportExcel);
+  await firstLoad;
+})();